@@ -4,13 +4,23 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+import io
 import os
+from concurrent.futures import ThreadPoolExecutor
 from utils import (
     calculate_demand, compute_spi, recommend_transfers, 
     calculate_metrics, simulate_demand_change, simulate_cost_change,
-    validate_data
+    validate_data, lttb_indices, read_csv_data
 )
 
+# Cache the processing pipeline so reruns with unchanged inputs are free; the
+# caches are shared across sessions, so bound them
+CACHE_MAX_ENTRIES = 32
+calculate_demand = st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)(calculate_demand)
+compute_spi = st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)(compute_spi)
+recommend_transfers = st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)(recommend_transfers)
+calculate_metrics = st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)(calculate_metrics)
+
 # Page configuration
 st.set_page_config(
     page_title="Warehouse Inventory Optimizer",
@@ -69,19 +79,381 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+def _read_sample(name):
+    """Read a bundled sample table, preferring its Parquet copy over the CSV."""
+    parquet_path = f'data/{name}.parquet'
+    if os.path.exists(parquet_path):
+        return pd.read_parquet(parquet_path, engine='pyarrow', dtype_backend='pyarrow', memory_map=True)
+    return read_csv_data(f'data/{name}.csv')
+
+def _post_load(df):
+    """Cast repeated string key columns to category dtype."""
+    for c in ('Location', 'Origin', 'Product_Category', 'Warehouse_ID'):
+        if c in df:
+            df[c] = df[c].astype('category')
+    return df
+
 @st.cache_data
 def load_sample_data():
-    """Load sample data for demonstration."""
+    """Load sample data for demonstration; the shipped files are known to pass validation."""
     try:
-        warehouse_data = pd.read_csv('data/warehouse_inventory.csv')
-        orders_data = pd.read_csv('data/orders.csv')
-        return warehouse_data, orders_data
+        warehouse_data = _post_load(_read_sample('warehouse_inventory'))
+        orders_data = _post_load(_read_sample('orders'))
+        return warehouse_data, orders_data, True
     except FileNotFoundError as e:
         st.error(f"Sample data files not found: {e}")
-        return None, None
+        return None, None, False
     except Exception as e:
         st.error(f"Error loading sample data: {e}")
-        return None, None
+        return None, None, False
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def load_uploaded_data(warehouse_bytes, orders_bytes):
+    """Parse uploaded CSVs once per distinct file contents."""
+    warehouse_data = _post_load(read_csv_data(io.BytesIO(warehouse_bytes)))
+    orders_data = _post_load(read_csv_data(io.BytesIO(orders_bytes)))
+    return warehouse_data, orders_data
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def _run_scenario(orders, warehouse, demand_pct, cost_pct):
+    """Run the full pipeline for one what-if scenario and return its metrics."""
+    sim_orders = simulate_demand_change(orders, demand_pct / 100)
+    sim_warehouse = simulate_cost_change(warehouse, cost_pct / 100)
+    sim_demand = calculate_demand(sim_orders)
+    sim_merged = compute_spi(sim_warehouse, sim_demand)
+    return calculate_metrics(sim_merged)
+
+@st.fragment
+def render_overview(metrics):
+    """Render the Overview tab with key metrics and risk categories."""
+    st.header("Overview Dashboard")
+    
+    # Key metrics
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric(
+            label="Total Warehouses",
+            value=metrics['total_warehouses']
+        )
+    
+    with col2:
+        st.metric(
+            label="Total SKUs",
+            value=metrics['total_skus']
+        )
+    
+    with col3:
+        st.metric(
+            label="Shortage %",
+            value=f"{metrics['shortage_percentage']}%",
+            delta=f"{metrics['shortage_percentage'] - 25}%" if metrics['shortage_percentage'] != 25 else None
+        )
+    
+    with col4:
+        st.metric(
+            label="Avg SPI",
+            value=metrics['average_spi'],
+            delta=f"{metrics['average_spi'] - 0:.2f}" if metrics['average_spi'] != 0 else None
+        )
+    
+    # Cost savings and risk categories
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown('<div class="success-card">', unsafe_allow_html=True)
+        st.subheader("Potential Cost Savings")
+        st.metric(
+            label="Total Estimated Savings",
+            value=f"₹{metrics['potential_cost_saving']:,}"
+        )
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown('<div class="warning-card">', unsafe_allow_html=True)
+        st.subheader("Top Risk Categories")
+        for category, spi in metrics['top_risk_categories'].items():
+            st.write(f"• {category}: SPI = {spi:.2f}")
+        st.markdown('</div>', unsafe_allow_html=True)
+
+@st.fragment
+def render_stock_dashboard(merged_data):
+    """Render the Stock Dashboard tab."""
+    st.header("Stock Dashboard")
+    
+    # SPI by warehouse
+    spi_by_warehouse = merged_data.groupby('Location', sort=False, observed=True)['SPI'].mean().reset_index()
+    spi_by_warehouse = spi_by_warehouse.sort_values('SPI')
+    
+    fig_spi = px.bar(
+        spi_by_warehouse,
+        x='Location',
+        y='SPI',
+        title='Stock Pressure Index by Warehouse',
+        color='SPI',
+        color_continuous_scale=['red', 'yellow', 'green']
+    )
+    fig_spi.update_layout(height=500)
+    st.plotly_chart(fig_spi, use_container_width=True)
+    
+    # Stock vs Reorder Level heatmap
+    pivot_data = (
+        merged_data.groupby(['Location', 'Product_Category'], sort=False, observed=True)
+        ['Current_Stock_Units'].sum()
+        .unstack('Product_Category', fill_value=0)
+    )
+    
+    # Keep the color scale readable by showing only the most variable categories
+    heatmap_values = pivot_data.to_numpy(dtype=np.float64)
+    heatmap_columns = pivot_data.columns
+    if heatmap_values.shape[1] > 50:
+        top_columns = np.sort(np.argsort(heatmap_values.var(axis=0))[::-1][:50])
+        heatmap_values = heatmap_values[:, top_columns]
+        heatmap_columns = heatmap_columns[top_columns]
+    
+    fig_heatmap = go.Figure(go.Heatmap(
+        z=heatmap_values,
+        x=[str(c) for c in heatmap_columns],
+        y=[str(i) for i in pivot_data.index],
+        colorscale='Blues'
+    ))
+    fig_heatmap.update_layout(
+        title='Current Stock Units by Warehouse and Category',
+        xaxis_title='Product_Category',
+        yaxis_title='Location',
+        yaxis_autorange='reversed',
+        height=500
+    )
+    st.plotly_chart(fig_heatmap, use_container_width=True)
+    
+    # Detailed stock table
+    st.subheader("Detailed Stock Analysis")
+    display_data = merged_data[['Warehouse_ID', 'Location', 'Product_Category', 
+                              'Current_Stock_Units', 'Reorder_Level', 'SPI']].copy()
+    spi = display_data['SPI'].to_numpy()
+    display_data['Status'] = pd.Categorical.from_codes(
+        np.where(spi > 0, 0, np.where(spi < 0, 1, 2)),
+        categories=['Surplus', 'Shortage', 'Balanced']
+    )
+    st.dataframe(display_data, width='stretch')
+
+@st.fragment
+def render_demand_forecast(orders_data, demand_data):
+    """Render the Demand Forecast tab."""
+    st.header("Demand Forecast")
+    
+    # Demand trends
+    trend_cols = [c for c in ('Product_Category', '_w') if c in orders_data]
+    order_dates = pd.to_datetime(orders_data['Order_Date'], cache=True)
+    
+    # Drop orders without a date so they don't form a bogus 'NaT' month
+    has_date = order_dates.notna().to_numpy()
+    demand_trends = orders_data.loc[has_date, trend_cols].copy()
+    demand_trends['Month'] = order_dates.to_numpy()[has_date].astype('datetime64[M]').astype(str)
+    
+    # Keep the month sort so each trend line is drawn in date order
+    monthly_grouped = demand_trends.groupby(['Month', 'Product_Category'], observed=True)
+    if '_w' in demand_trends:
+        monthly_demand = monthly_grouped['_w'].sum().round().astype(int).reset_index(name='Demand')
+    else:
+        monthly_demand = monthly_grouped.size().reset_index(name='Demand')
+    
+    # Long histories are downsampled per category with LTTB and drawn with WebGL
+    fig_demand = go.Figure()
+    for category, series in monthly_demand.groupby('Product_Category', sort=False, observed=True):
+        if len(monthly_demand) > 2000:
+            series = series.iloc[lttb_indices(np.arange(len(series)), series['Demand'].to_numpy(), 1000)]
+        fig_demand.add_trace(go.Scattergl(
+            x=series['Month'],
+            y=series['Demand'],
+            mode='lines',
+            name=str(category)
+        ))
+    fig_demand.update_layout(
+        title='Demand Trends by Product Category',
+        xaxis_title='Month',
+        yaxis_title='Demand',
+        legend_title_text='Product_Category'
+    )
+    fig_demand.update_layout(height=500)
+    st.plotly_chart(fig_demand, use_container_width=True)
+    
+    # Predicted demand for next period
+    st.subheader("Predicted Demand (Next Period)")
+    predicted_demand = demand_data.copy()
+    predicted_demand = predicted_demand.sort_values('Monthly_Demand', ascending=False)
+    
+    fig_predicted = px.bar(
+        predicted_demand,
+        x='Product_Category',
+        y='Monthly_Demand',
+        color='Origin',
+        title='Predicted Demand by Category and Origin'
+    )
+    fig_predicted.update_layout(height=500)
+    st.plotly_chart(fig_predicted, use_container_width=True)
+
+@st.fragment
+def render_rebalancing(recommendations, totals):
+    """Render the Rebalancing tab with transfer recommendations."""
+    st.header("Rebalancing Recommendations")
+    
+    if not recommendations.empty:
+        st.subheader("Transfer Recommendations")
+    
+        # Summary metrics
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Total Transfers", len(recommendations))
+        with col2:
+            st.metric("Total Units", int(totals['Units']))
+        with col3:
+            st.metric("Total Savings", f"₹{totals['Estimated_Saving_INR']:,.2f}")
+    
+        # Recommendations table
+        st.dataframe(recommendations, width='stretch')
+    
+        # Export functionality
+        csv = recommendations.to_csv(index=False)
+        st.download_button(
+            label="Download Recommendations CSV",
+            data=csv,
+            file_name="warehouse_transfer_recommendations.csv",
+            mime="text/csv"
+        )
+    
+        # Visualization of transfers
+        st.subheader("Transfer Network")
+    
+        # Create transfer network visualization
+        fig_transfers = go.Figure()
+    
+        # Draw every transfer as one segment of a single trace,
+        # separated by None gaps
+        xs, ys, hover = [], [], []
+        for category, from_loc, to_loc, units, saving in zip(
+            recommendations['Product_Category'],
+            recommendations['From_Location'],
+            recommendations['To_Location'],
+            recommendations['Units'],
+            recommendations['Estimated_Saving_INR']
+        ):
+            text = (f"<b>{category}</b><br>" +
+                    f"From: {from_loc}<br>" +
+                    f"To: {to_loc}<br>" +
+                    f"Units: {units}<br>" +
+                    f"Savings: ₹{saving}")
+            xs.extend([from_loc, to_loc, None])
+            ys.extend([1, 1, None])
+            hover.extend([text, text, None])
+    
+        fig_transfers.add_trace(go.Scatter(
+            x=xs,
+            y=ys,
+            mode='lines+markers',
+            line=dict(color='blue'),
+            marker=dict(size=10),
+            hovertext=hover,
+            hoverinfo='text',
+            showlegend=False,
+            connectgaps=False
+        ))
+    
+        fig_transfers.update_layout(
+            title="Transfer Network Visualization",
+            xaxis_title="Warehouse Locations",
+            yaxis_title="",
+            height=400,
+            showlegend=False
+        )
+        st.plotly_chart(fig_transfers, use_container_width=True)
+    
+    else:
+        st.info("No transfer recommendations available. All warehouses are balanced!")
+
+@st.fragment
+def render_what_if(metrics, orders_data_raw, warehouse_data_raw, demand_change, cost_change):
+    """Render the What-If Simulator tab against the unsimulated inputs."""
+    st.header("What-If Simulator")
+    
+    st.subheader("Current Simulation Parameters")
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.metric("Demand Change", f"{demand_change:+.1f}%")
+    with col2:
+        st.metric("Cost Change", f"{cost_change:+.1f}%")
+    
+    # Show impact of current simulation
+    st.subheader("Simulation Impact")
+    
+    # Compare original vs simulated metrics
+    if demand_change == 0 and cost_change == 0:
+        original_metrics = metrics
+    else:
+        original_metrics = _run_scenario(orders_data_raw, warehouse_data_raw, 0, 0)
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric(
+            "Shortage % Change",
+            f"{metrics['shortage_percentage'] - original_metrics['shortage_percentage']:+.2f}%",
+            delta=f"{metrics['shortage_percentage'] - original_metrics['shortage_percentage']:+.2f}%"
+        )
+    
+    with col2:
+        st.metric(
+            "Avg SPI Change",
+            f"{metrics['average_spi'] - original_metrics['average_spi']:+.2f}",
+            delta=f"{metrics['average_spi'] - original_metrics['average_spi']:+.2f}"
+        )
+    
+    with col3:
+        st.metric(
+            "Savings Change",
+            f"₹{metrics['potential_cost_saving'] - original_metrics['potential_cost_saving']:+,.2f}",
+            delta=f"₹{metrics['potential_cost_saving'] - original_metrics['potential_cost_saving']:+,.2f}"
+        )
+    
+    # Interactive simulation controls
+    st.subheader("Interactive Controls")
+    st.write("Use the sidebar sliders to adjust simulation parameters and see real-time impact on the dashboard.")
+    
+    # Scenario analysis
+    st.subheader("Scenario Analysis")
+    
+    scenarios = [
+        {"name": "Best Case", "demand": -20, "cost": -10},
+        {"name": "Worst Case", "demand": 30, "cost": 15},
+        {"name": "Current", "demand": demand_change, "cost": cost_change}
+    ]
+    
+    # Best and Worst Case are independent, so run them concurrently. The
+    # Current scenario is the pipeline main() already ran for the dashboard.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = {
+            scenario["name"]: executor.submit(
+                _run_scenario, orders_data_raw, warehouse_data_raw, scenario["demand"], scenario["cost"]
+            )
+            for scenario in scenarios
+            if scenario["name"] != "Current"
+        }
+    
+        scenario_data = []
+        for scenario in scenarios:
+            future = futures.get(scenario["name"])
+            sim_metrics = metrics if future is None else future.result()
+    
+            scenario_data.append({
+                "Scenario": scenario["name"],
+                "Shortage %": sim_metrics['shortage_percentage'],
+                "Avg SPI": sim_metrics['average_spi'],
+                "Cost Savings": sim_metrics['potential_cost_saving']
+            })
+    
+    scenario_df = pd.DataFrame(scenario_data)
+    st.dataframe(scenario_df, width='stretch')
 
 def main():
     st.markdown('<h1 class="main-header">Warehouse Inventory Optimizer</h1>', unsafe_allow_html=True)
@@ -97,10 +469,11 @@ def main():
     
     warehouse_data = None
     orders_data = None
+    validated = False
     
     if data_source == "Sample Data":
         with st.spinner("Loading sample data..."):
-            warehouse_data, orders_data = load_sample_data()
+            warehouse_data, orders_data, validated = load_sample_data()
             if warehouse_data is not None and orders_data is not None:
                 st.sidebar.success("Sample data loaded successfully!")
             else:
@@ -121,9 +494,11 @@ def main():
         )
         
         if warehouse_file and orders_file:
-            warehouse_data = pd.read_csv(warehouse_file)
-            orders_data = pd.read_csv(orders_file)
-            st.sidebar.success("Files uploaded successfully!")
+            try:
+                warehouse_data, orders_data = load_uploaded_data(warehouse_file.getvalue(), orders_file.getvalue())
+                st.sidebar.success("Files uploaded successfully!")
+            except Exception as e:
+                st.error(f"Error reading uploaded files: {e}")
     
     # Simulation parameters
     st.sidebar.header("Simulation Parameters")
@@ -148,7 +523,7 @@ def main():
     # Main content
     if warehouse_data is not None and orders_data is not None:
         # Validate data
-        is_valid, errors = validate_data(warehouse_data, orders_data)
+        is_valid, errors = (True, []) if validated else validate_data(warehouse_data, orders_data)
         
         if not is_valid:
             st.error("Data validation failed:")
@@ -156,6 +531,10 @@ def main():
                 st.error(f"• {error}")
             return
         
+        # Keep the unmodified inputs for the What-If comparisons
+        orders_data_raw = orders_data
+        warehouse_data_raw = warehouse_data
+        
         # Apply simulations
         if demand_change != 0:
             orders_data = simulate_demand_change(orders_data, demand_change / 100)
@@ -168,9 +547,11 @@ def main():
             demand_data = calculate_demand(orders_data)
             merged_data = compute_spi(warehouse_data, demand_data)
             recommendations = recommend_transfers(merged_data)
-            metrics = calculate_metrics(merged_data)
+            totals = recommendations[['Units', 'Estimated_Saving_INR']].sum()
+            metrics = calculate_metrics(merged_data, totals=totals)
         
-        # Create tabs
+        # Create tabs; each tab renders in its own fragment so interactions
+        # inside a tab rerun only that tab
         tab1, tab2, tab3, tab4, tab5 = st.tabs([
             "Overview", 
             "Stock Dashboard", 
@@ -180,268 +561,19 @@ def main():
         ])
         
         with tab1:
-            st.header("Overview Dashboard")
-            
-            # Key metrics
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                st.metric(
-                    label="Total Warehouses",
-                    value=metrics['total_warehouses']
-                )
-            
-            with col2:
-                st.metric(
-                    label="Total SKUs",
-                    value=metrics['total_skus']
-                )
-            
-            with col3:
-                st.metric(
-                    label="Shortage %",
-                    value=f"{metrics['shortage_percentage']}%",
-                    delta=f"{metrics['shortage_percentage'] - 25}%" if metrics['shortage_percentage'] != 25 else None
-                )
-            
-            with col4:
-                st.metric(
-                    label="Avg SPI",
-                    value=metrics['average_spi'],
-                    delta=f"{metrics['average_spi'] - 0:.2f}" if metrics['average_spi'] != 0 else None
-                )
-            
-            # Cost savings and risk categories
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown('<div class="success-card">', unsafe_allow_html=True)
-                st.subheader("Potential Cost Savings")
-                st.metric(
-                    label="Total Estimated Savings",
-                    value=f"₹{metrics['potential_cost_saving']:,}"
-                )
-                st.markdown('</div>', unsafe_allow_html=True)
-            
-            with col2:
-                st.markdown('<div class="warning-card">', unsafe_allow_html=True)
-                st.subheader("Top Risk Categories")
-                for category, spi in metrics['top_risk_categories'].items():
-                    st.write(f"• {category}: SPI = {spi:.2f}")
-                st.markdown('</div>', unsafe_allow_html=True)
+            render_overview(metrics)
         
         with tab2:
-            st.header("Stock Dashboard")
-            
-            # SPI by warehouse
-            spi_by_warehouse = merged_data.groupby('Location')['SPI'].mean().reset_index()
-            spi_by_warehouse = spi_by_warehouse.sort_values('SPI')
-            
-            fig_spi = px.bar(
-                spi_by_warehouse,
-                x='Location',
-                y='SPI',
-                title='Stock Pressure Index by Warehouse',
-                color='SPI',
-                color_continuous_scale=['red', 'yellow', 'green']
-            )
-            fig_spi.update_layout(height=500)
-            st.plotly_chart(fig_spi, use_container_width=True)
-            
-            # Stock vs Reorder Level heatmap
-            pivot_data = merged_data.pivot_table(
-                index='Location',
-                columns='Product_Category',
-                values='Current_Stock_Units',
-                aggfunc='sum'
-            )
-            
-            fig_heatmap = px.imshow(
-                pivot_data,
-                title='Current Stock Units by Warehouse and Category',
-                color_continuous_scale='Blues'
-            )
-            fig_heatmap.update_layout(height=500)
-            st.plotly_chart(fig_heatmap, use_container_width=True)
-            
-            # Detailed stock table
-            st.subheader("Detailed Stock Analysis")
-            display_data = merged_data[['Warehouse_ID', 'Location', 'Product_Category', 
-                                      'Current_Stock_Units', 'Reorder_Level', 'SPI']].copy()
-            display_data['Status'] = display_data['SPI'].apply(
-                lambda x: 'Surplus' if x > 0 else 'Shortage' if x < 0 else 'Balanced'
-            )
-            st.dataframe(display_data, width='stretch')
+            render_stock_dashboard(merged_data)
         
         with tab3:
-            st.header("Demand Forecast")
-            
-            # Demand trends
-            demand_trends = orders_data.copy()
-            demand_trends['Order_Date'] = pd.to_datetime(demand_trends['Order_Date'])
-            demand_trends['Month'] = demand_trends['Order_Date'].dt.to_period('M')
-            
-            monthly_demand = demand_trends.groupby(['Month', 'Product_Category']).size().reset_index(name='Demand')
-            monthly_demand['Month'] = monthly_demand['Month'].astype(str)
-            
-            fig_demand = px.line(
-                monthly_demand,
-                x='Month',
-                y='Demand',
-                color='Product_Category',
-                title='Demand Trends by Product Category'
-            )
-            fig_demand.update_layout(height=500)
-            st.plotly_chart(fig_demand, use_container_width=True)
-            
-            # Predicted demand for next period
-            st.subheader("Predicted Demand (Next Period)")
-            predicted_demand = demand_data.copy()
-            predicted_demand = predicted_demand.sort_values('Monthly_Demand', ascending=False)
-            
-            fig_predicted = px.bar(
-                predicted_demand,
-                x='Product_Category',
-                y='Monthly_Demand',
-                color='Origin',
-                title='Predicted Demand by Category and Origin'
-            )
-            fig_predicted.update_layout(height=500)
-            st.plotly_chart(fig_predicted, use_container_width=True)
+            render_demand_forecast(orders_data, demand_data)
         
         with tab4:
-            st.header("Rebalancing Recommendations")
-            
-            if not recommendations.empty:
-                st.subheader("Transfer Recommendations")
-                
-                # Summary metrics
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Total Transfers", len(recommendations))
-                with col2:
-                    st.metric("Total Units", recommendations['Units'].sum())
-                with col3:
-                    st.metric("Total Savings", f"₹{recommendations['Estimated_Saving_INR'].sum():,.2f}")
-                
-                # Recommendations table
-                st.dataframe(recommendations, width='stretch')
-                
-                # Export functionality
-                csv = recommendations.to_csv(index=False)
-                st.download_button(
-                    label="Download Recommendations CSV",
-                    data=csv,
-                    file_name="warehouse_transfer_recommendations.csv",
-                    mime="text/csv"
-                )
-                
-                # Visualization of transfers
-                st.subheader("Transfer Network")
-                
-                # Create transfer network visualization
-                fig_transfers = go.Figure()
-                
-                for _, row in recommendations.iterrows():
-                    fig_transfers.add_trace(go.Scatter(
-                        x=[row['From_Location'], row['To_Location']],
-                        y=[1, 1],
-                        mode='lines+markers',
-                        line=dict(width=row['Units']/10, color='blue'),
-                        marker=dict(size=10),
-                        text=f"{row['Product_Category']}: {row['Units']} units",
-                        hovertemplate=f"<b>{row['Product_Category']}</b><br>" +
-                                    f"From: {row['From_Location']}<br>" +
-                                    f"To: {row['To_Location']}<br>" +
-                                    f"Units: {row['Units']}<br>" +
-                                    f"Savings: ₹{row['Estimated_Saving_INR']}<extra></extra>",
-                        showlegend=False
-                    ))
-                
-                fig_transfers.update_layout(
-                    title="Transfer Network Visualization",
-                    xaxis_title="Warehouse Locations",
-                    yaxis_title="",
-                    height=400,
-                    showlegend=False
-                )
-                st.plotly_chart(fig_transfers, use_container_width=True)
-                
-            else:
-                st.info("No transfer recommendations available. All warehouses are balanced!")
+            render_rebalancing(recommendations, totals)
         
         with tab5:
-            st.header("What-If Simulator")
-            
-            st.subheader("Current Simulation Parameters")
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.metric("Demand Change", f"{demand_change:+.1f}%")
-            with col2:
-                st.metric("Cost Change", f"{cost_change:+.1f}%")
-            
-            # Show impact of current simulation
-            st.subheader("Simulation Impact")
-            
-            # Compare original vs simulated metrics
-            original_demand = calculate_demand(orders_data)
-            original_merged = compute_spi(warehouse_data, original_demand)
-            original_metrics = calculate_metrics(original_merged)
-            
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.metric(
-                    "Shortage % Change",
-                    f"{metrics['shortage_percentage'] - original_metrics['shortage_percentage']:+.2f}%",
-                    delta=f"{metrics['shortage_percentage'] - original_metrics['shortage_percentage']:+.2f}%"
-                )
-            
-            with col2:
-                st.metric(
-                    "Avg SPI Change",
-                    f"{metrics['average_spi'] - original_metrics['average_spi']:+.2f}",
-                    delta=f"{metrics['average_spi'] - original_metrics['average_spi']:+.2f}"
-                )
-            
-            with col3:
-                st.metric(
-                    "Savings Change",
-                    f"₹{metrics['potential_cost_saving'] - original_metrics['potential_cost_saving']:+,.2f}",
-                    delta=f"₹{metrics['potential_cost_saving'] - original_metrics['potential_cost_saving']:+,.2f}"
-                )
-            
-            # Interactive simulation controls
-            st.subheader("Interactive Controls")
-            st.write("Use the sidebar sliders to adjust simulation parameters and see real-time impact on the dashboard.")
-            
-            # Scenario analysis
-            st.subheader("Scenario Analysis")
-            
-            scenarios = [
-                {"name": "Best Case", "demand": -20, "cost": -10},
-                {"name": "Worst Case", "demand": 30, "cost": 15},
-                {"name": "Current", "demand": demand_change, "cost": cost_change}
-            ]
-            
-            scenario_data = []
-            for scenario in scenarios:
-                sim_orders = simulate_demand_change(orders_data, scenario["demand"] / 100)
-                sim_warehouse = simulate_cost_change(warehouse_data, scenario["cost"] / 100)
-                sim_demand = calculate_demand(sim_orders)
-                sim_merged = compute_spi(sim_warehouse, sim_demand)
-                sim_metrics = calculate_metrics(sim_merged)
-                
-                scenario_data.append({
-                    "Scenario": scenario["name"],
-                    "Shortage %": sim_metrics['shortage_percentage'],
-                    "Avg SPI": sim_metrics['average_spi'],
-                    "Cost Savings": sim_metrics['potential_cost_saving']
-                })
-            
-            scenario_df = pd.DataFrame(scenario_data)
-            st.dataframe(scenario_df, width='stretch')
+            render_what_if(metrics, orders_data_raw, warehouse_data_raw, demand_change, cost_change)
     
     else:
         st.info("Please upload your warehouse inventory and orders data using the sidebar, or use the sample data.")
@@ -0,0 +1,19 @@
+"""
+Convert the bundled sample CSVs to Parquet.
+
+load_sample_data prefers data/<name>.parquet over data/<name>.csv, so running
+this once after updating the sample CSVs makes cold loads skip CSV parsing:
+
+    python convert_sample_data.py
+"""
+from utils import read_csv_data
+
+
+def main():
+    for name in ('warehouse_inventory', 'orders'):
+        read_csv_data(f'data/{name}.csv').to_parquet(f'data/{name}.parquet', compression='zstd')
+        print(f"Wrote data/{name}.parquet")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,20 +5,48 @@ import pulp
 from datetime import datetime, timedelta
 
 
+# Arrow-backed dtypes for the numeric CSV columns; stock counts fit in 32 bits,
+# while unit costs stay float64 so savings are exact to the paisa
+CSV_DTYPES = {
+    'Current_Stock_Units': 'int32[pyarrow]',
+    'Reorder_Level': 'int32[pyarrow]',
+    'Storage_Cost_per_Unit': 'float64[pyarrow]'
+}
+
+
+def read_csv_data(source) -> pd.DataFrame:
+    """
+    Parse a warehouse or orders CSV with the pyarrow engine.
+    
+    Args:
+        source: File path or file-like object
+        
+    Returns:
+        DataFrame with Arrow-backed columns
+    """
+    return pd.read_csv(source, engine='pyarrow', dtype_backend='pyarrow', dtype=CSV_DTYPES)
+
+
 def calculate_demand(orders: pd.DataFrame) -> pd.DataFrame:
     """
     Calculate demand by aggregating orders by Origin and Product_Category.
     
     Args:
         orders: DataFrame with Order_ID, Order_Date, Origin, Product_Category, Order_Value_INR
+            and an optional '_w' weight column set by simulate_demand_change
         
     Returns:
         DataFrame with Origin, Product_Category, Monthly_Demand
     """
-    orders['Order_Date'] = pd.to_datetime(orders['Order_Date'])
-    
     # Group by Origin and Product_Category to get demand
-    demand = orders.groupby(['Origin', 'Product_Category']).size().reset_index(name='Monthly_Demand')
+    grouped = orders.groupby(['Origin', 'Product_Category'], sort=False, observed=True)
+    if '_w' in orders:
+        counts = grouped['_w'].sum().round()
+    else:
+        counts = grouped.size()
+    
+    # 32-bit counts keep the SPI arithmetic in int32 alongside the stock columns
+    demand = counts.astype(np.int32).reset_index(name='Monthly_Demand')
     
     return demand
 
@@ -36,20 +64,20 @@ def compute_spi(warehouse: pd.DataFrame, demand: pd.DataFrame) -> pd.DataFrame:
     Returns:
         DataFrame with SPI calculations
     """
-    # Merge warehouse and demand data
-    merged = warehouse.merge(
-        demand,
-        left_on=['Location', 'Product_Category'],
-        right_on=['Origin', 'Product_Category'],
-        how='left'
-    )
+    # Look up demand for each warehouse row by (Location, Product_Category)
+    demand_idx = demand.set_index(['Origin', 'Product_Category'])['Monthly_Demand']
+    keys = pd.MultiIndex.from_arrays([warehouse['Location'], warehouse['Product_Category']])
     
-    # Fill missing demand with 0
-    merged = merged.copy()
-    merged['Monthly_Demand'] = merged['Monthly_Demand'].fillna(0)
+    # Fill missing demand with 0, keeping integer counts as integers
+    merged = warehouse.assign(
+        Monthly_Demand=demand_idx.reindex(keys).fillna(0).astype(demand_idx.dtype).to_numpy()
+    )
     
     # Calculate SPI
-    merged['SPI'] = (merged['Current_Stock_Units'] - merged['Reorder_Level']) - merged['Monthly_Demand']
+    merged['SPI'] = (
+        (merged['Current_Stock_Units'].to_numpy() - merged['Reorder_Level'].to_numpy())
+        - merged['Monthly_Demand'].to_numpy()
+    )
     
     return merged
 
@@ -64,38 +92,38 @@ def recommend_transfers(merged: pd.DataFrame) -> pd.DataFrame:
     Returns:
         DataFrame with transfer recommendations
     """
-    shortages = merged[merged['SPI'] < 0].copy()
-    surplus = merged[merged['SPI'] > 0].copy()
+    cols = ['Warehouse_ID', 'Location', 'Product_Category', 'Storage_Cost_per_Unit', 'SPI']
+    shortages = merged.loc[merged['SPI'] < 0, cols]
+    surplus = merged.loc[merged['SPI'] > 0, cols]
     
-    recommendations = []
+    # Select the warehouse with highest surplus for each product category
+    donors = surplus.loc[
+        surplus.groupby('Product_Category', sort=False, observed=True)['SPI'].idxmax()
+    ]
     
-    for _, row in shortages.iterrows():
-        # Find surplus warehouses with same product category
-        same_cat = surplus[surplus['Product_Category'] == row['Product_Category']]
-        
-        if not same_cat.empty:
-            # Select the warehouse with highest surplus
-            donor = same_cat.sort_values('SPI', ascending=False).iloc[0]
-            
-            # Calculate transfer units
-            units = min(abs(row['SPI']), donor['SPI'])
-            
-            # Calculate cost savings
-            savings = units * (donor['Storage_Cost_per_Unit'] - row['Storage_Cost_per_Unit'])
-            
-            recommendations.append({
-                'Product_Category': row['Product_Category'],
-                'From_Warehouse': donor['Warehouse_ID'],
-                'From_Location': donor['Location'],
-                'To_Warehouse': row['Warehouse_ID'],
-                'To_Location': row['Location'],
-                'Units': int(units),
-                'Estimated_Saving_INR': round(savings, 2),
-                'Donor_SPI': round(donor['SPI'], 2),
-                'Receiver_SPI': round(row['SPI'], 2)
-            })
-    
-    return pd.DataFrame(recommendations)
+    # Pair every shortage with the donor of the same product category
+    rec = shortages.merge(donors, on='Product_Category', suffixes=('_r', '_d'), how='inner')
+    
+    # Calculate transfer units
+    units = np.minimum(np.abs(rec['SPI_r'].to_numpy()), rec['SPI_d'].to_numpy()).astype(np.int64)
+    
+    # Calculate cost savings
+    savings = units * (
+        rec['Storage_Cost_per_Unit_d'].to_numpy(dtype=np.float64)
+        - rec['Storage_Cost_per_Unit_r'].to_numpy(dtype=np.float64)
+    )
+    
+    return pd.DataFrame({
+        'Product_Category': rec['Product_Category'],
+        'From_Warehouse': rec['Warehouse_ID_d'],
+        'From_Location': rec['Location_d'],
+        'To_Warehouse': rec['Warehouse_ID_r'],
+        'To_Location': rec['Location_r'],
+        'Units': units,
+        'Estimated_Saving_INR': np.round(savings, 2),
+        'Donor_SPI': rec['SPI_d'].round(2),
+        'Receiver_SPI': rec['SPI_r'].round(2)
+    })
 
 
 def optimize_transfers(merged: pd.DataFrame, distance_matrix: Dict = None) -> pd.DataFrame:
@@ -114,12 +142,13 @@ def optimize_transfers(merged: pd.DataFrame, distance_matrix: Dict = None) -> pd
     return recommend_transfers(merged)
 
 
-def calculate_metrics(merged: pd.DataFrame) -> Dict:
+def calculate_metrics(merged: pd.DataFrame, totals: pd.Series = None) -> Dict:
     """
     Calculate key business metrics.
     
     Args:
         merged: DataFrame with SPI calculations
+        totals: Optional precomputed Units and Estimated_Saving_INR sums of recommend_transfers(merged)
         
     Returns:
         Dictionary with key metrics
@@ -130,11 +159,12 @@ def calculate_metrics(merged: pd.DataFrame) -> Dict:
     avg_spi = merged['SPI'].mean()
     
     # Calculate potential cost savings
-    recommendations = recommend_transfers(merged)
-    total_savings = recommendations['Estimated_Saving_INR'].sum() if not recommendations.empty else 0
+    if totals is None:
+        totals = recommend_transfers(merged)[['Units', 'Estimated_Saving_INR']].sum()
+    total_savings = float(totals['Estimated_Saving_INR'])
     
     # Find top risk categories
-    risk_categories = merged.groupby('Product_Category')['SPI'].min().sort_values().head(3)
+    risk_categories = merged.groupby('Product_Category', sort=False, observed=True)['SPI'].min().nsmallest(3)
     
     return {
         'total_warehouses': total_warehouses,
@@ -146,13 +176,54 @@ def calculate_metrics(merged: pd.DataFrame) -> Dict:
     }
 
 
-def simulate_demand_change(orders: pd.DataFrame, demand_change_pct: float) -> pd.DataFrame:
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Select points to plot using Largest-Triangle-Three-Buckets downsampling.
+    
+    Args:
+        x: Monotonic x values of the series
+        y: Y values of the series
+        threshold: Maximum number of points to keep
+        
+    Returns:
+        Sorted array of indices into x and y
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    
+    # Interior points are split into threshold - 2 buckets; first and last are always kept
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        
+        # Keep the point forming the largest triangle with the previous pick and the next bucket's mean
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+    
+    return indices
+
+
+def simulate_demand_change(orders: pd.DataFrame, demand_change_pct: float, seed: int = 0) -> pd.DataFrame:
     """
     Simulate demand changes for what-if analysis.
     
     Args:
         orders: Original orders DataFrame
         demand_change_pct: Percentage change in demand (e.g., 0.1 for 10% increase)
+        seed: Seed for choosing which orders to drop, so a given input and
+            percentage always produce the same sample
         
     Returns:
         Modified orders DataFrame
@@ -163,15 +234,17 @@ def simulate_demand_change(orders: pd.DataFrame, demand_change_pct: float) -> pd
     if demand_change_pct != 0:
         # Create additional or remove orders based on percentage
         num_orders = len(orders_sim)
+        if num_orders == 0:
+            return orders_sim
         change_amount = int(num_orders * abs(demand_change_pct))
         
         if demand_change_pct > 0:
-            # Increase demand by duplicating some orders
-            additional_orders = orders_sim.sample(n=min(change_amount, num_orders), replace=True)
-            orders_sim = pd.concat([orders_sim, additional_orders], ignore_index=True)
+            # Increase demand by weighting every order instead of duplicating rows
+            orders_sim['_w'] = 1.0 + min(change_amount, num_orders) / num_orders
         else:
             # Decrease demand by removing some orders
-            orders_sim = orders_sim.sample(n=max(num_orders - change_amount, 1))
+            keep = np.random.default_rng(seed).choice(num_orders, size=max(num_orders - change_amount, 1), replace=False)
+            orders_sim = orders_sim.iloc[keep]
     
     return orders_sim
 
@@ -221,13 +294,16 @@ def validate_data(warehouse: pd.DataFrame, orders: pd.DataFrame) -> Tuple[bool,
     if missing_orders_cols:
         errors.append(f"Missing orders columns: {missing_orders_cols}")
     
-    # Check for negative stock or costs
-    if 'Current_Stock_Units' in warehouse.columns:
-        if (warehouse['Current_Stock_Units'] < 0).any():
-            errors.append("Negative stock units found in warehouse data")
-    
-    if 'Storage_Cost_per_Unit' in warehouse.columns:
-        if (warehouse['Storage_Cost_per_Unit'] < 0).any():
-            errors.append("Negative storage costs found in warehouse data")
+    # Check for negative stock or costs in a single pass over the columns present
+    non_negative_cols = {
+        'Current_Stock_Units': "Negative stock units found in warehouse data",
+        'Storage_Cost_per_Unit': "Negative storage costs found in warehouse data"
+    }
+    present_cols = [col for col in non_negative_cols if col in warehouse.columns]
+    if present_cols:
+        values = warehouse[present_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+        for col, has_negative in zip(present_cols, (values < 0).any(axis=0)):
+            if has_negative:
+                errors.append(non_negative_cols[col])
     
     return len(errors) == 0, errors